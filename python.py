@@ -1,18 +1,169 @@
 import random
-import math
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from numba import njit, prange, get_num_threads, set_num_threads
+
+
+# explicit signatures: kernels are compiled eagerly at import (or loaded
+# from the on-disk cache) instead of on the first call inside tabu_search
+@njit('Tuple((i4[::1], i4[::1]))(i4[:, ::1], i4[::1], i8)', cache=True)
+def locate_clients(routes, lens, n_cities):
+	"""
+	Return (route_of, pos_of): the route and position of every routed
+	client, route_of being -1 for cities on no route.
+	"""
+	route_of = np.full(n_cities, -1, dtype=np.int32)
+	pos_of = np.zeros(n_cities, dtype=np.int32)
+	for r in range(routes.shape[0]):
+		for b in range(lens[r]):
+			route_of[routes[r, b]] = r
+			pos_of[routes[r, b]] = b
+	return route_of, pos_of
+
+
+@njit(
+	'Tuple((i8, i8, i8, i8, f8))('
+	'f8[:, ::1], i4[:, ::1], i4[:, ::1], i4[::1], i4[::1], i4[::1], i8, '
+	'i4[:, ::1], i8, i8, i8)',
+	cache=True, parallel=True,
+	# fastmath without ninf/nnan: np.inf is used as the "no move yet" sentinel
+	fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+)
+def best_move(D, knn, routes, lens, loads, demands, cap, tabu_expiry, it, n_cars, depot):
+	"""
+	Scan relocations of a single client between two routes and
+	return the cheapest allowed one as (i, a, j, b, delta):
+	client at position a of route i is inserted at position b of route j.
+	i == -1 means no feasible move exists.
+	A move of client k into route j must fit the route's remaining
+	capacity and must not be tabu (tabu_expiry[k, j] > it).
+
+	Client k is only inserted right after one of its nearest
+	neighbours knn[k] (the depot standing for the start of every route).
+
+	Source routes are scanned in parallel, each keeping its own best
+	move, and the per-route results are reduced at the end.
+	"""
+	route_of, pos_of = locate_clients(routes, lens, D.shape[0])
+
+	# remaining capacity of every route
+	slack = cap - loads
+
+	local_delta = np.full(n_cars, np.inf)
+	local_move = np.full((n_cars, 3), -1, dtype=np.int32)
+
+	for i in prange(n_cars):
+		for a in range(lens[i]):
+			k = routes[i, a]
+			demand = demands[k]
+			prev = routes[i, a - 1] if a > 0 else depot
+			nxt = routes[i, a + 1] if a + 1 < lens[i] else depot
+			# cost saved by taking k out of route i
+			removal_delta = D[prev, k] + D[k, nxt] - D[prev, nxt]
+
+			for p in knn[k]:
+				if p == depot:
+					# insert at the start of any other route
+					j_from, j_to, b = 0, n_cars, 0
+				else:
+					j_from = route_of[p]
+					if j_from < 0:
+						continue
+					j_to, b = j_from + 1, pos_of[p] + 1
+
+				for j in range(j_from, j_to):
+					if i == j or demand > slack[j]:
+						continue
+					if tabu_expiry[k, j] > it:
+						continue
+					q = routes[j, b] if b < lens[j] else depot
+					delta = D[p, k] + D[k, q] - D[p, q] - removal_delta
+					if delta < local_delta[i]:
+						local_delta[i] = delta
+						local_move[i, 0] = a
+						local_move[i, 1] = j
+						local_move[i, 2] = b
+
+	best_i = -1
+	best_delta = np.inf
+	for i in range(n_cars):
+		if local_delta[i] < best_delta:
+			best_i = i
+			best_delta = local_delta[i]
+
+	if best_i < 0:
+		return -1, -1, -1, -1, best_delta
+	return best_i, local_move[best_i, 0], local_move[best_i, 1], local_move[best_i, 2], best_delta
+
+
+
+@njit(
+	'Tuple((i8, i8, i8, i8, f8))('
+	'f8[:, ::1], i4[:, ::1], i4[:, ::1], i4[::1], i4[::1], i4[::1], i8, '
+	'i4[:, ::1], i8, i4[:, ::1], i8)',
+	cache=True,
+	fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+)
+def best_sampled_move(D, knn, routes, lens, loads, demands, cap, tabu_expiry, it, pairs, depot):
+	"""
+	Same as best_move, restricted to the sampled (client, target route)
+	rows of pairs: only those moves are evaluated, so the cost grows with
+	the sample size instead of the number of clients.
+	"""
+	route_of, pos_of = locate_clients(routes, lens, D.shape[0])
+
+	best_i, best_a, best_j, best_b = -1, -1, -1, -1
+	best_delta = np.inf
+
+	for s in range(pairs.shape[0]):
+		k, j = pairs[s, 0], pairs[s, 1]
+		i = route_of[k]
+		if i < 0 or i == j or demands[k] > cap - loads[j]:
+			continue
+		if tabu_expiry[k, j] > it:
+			continue
+
+		a = pos_of[k]
+		prev = routes[i, a - 1] if a > 0 else depot
+		nxt = routes[i, a + 1] if a + 1 < lens[i] else depot
+		# cost saved by taking k out of route i
+		removal_delta = D[prev, k] + D[k, nxt] - D[prev, nxt]
+
+		for p in knn[k]:
+			if p == depot:
+				b = 0
+			elif route_of[p] == j:
+				b = pos_of[p] + 1
+			else:
+				continue
+			q = routes[j, b] if b < lens[j] else depot
+			delta = D[p, k] + D[k, q] - D[p, q] - removal_delta
+			if delta < best_delta:
+				best_delta = delta
+				best_i, best_a, best_j, best_b = i, a, j, b
+
+	return best_i, best_a, best_j, best_b, best_delta
 
 class VRP:
-	def __init__(self, cities, n_cars=5, capacity=1000, tabu_tenure=10, iterations=200, seed=42):
+	def __init__(self, cities, n_cars=5, capacity=1000, tabu_tenure=10, iterations=200, seed=42, n_threads=None, sample_size=None, n_neighbors=10):
 		"""
 		Initialize the VRP model.
 
-		cities: list of tuples (name, demand, y, x)
+		cities: list of tuples (name, integer demand, y, x)
 		n_cars: number of available vehicles
-		capacity: maximum total demand per vehicle
+		capacity: maximum total demand per vehicle (integer)
 		tabu_tenure: number of iterations a move remains tabu
 		iterations: total number of tabu search iterations
 		seed: random seed for deterministic behavior
+		n_threads: number of threads for the neighborhood scan (None keeps numba's default)
+		sample_size: number of random (client, route) pairs examined per iteration
+			(None examines the full neighborhood)
+		n_neighbors: a client is only inserted after one of its n_neighbors nearest
+			cities (None allows every insertion position)
 		"""
 		self.cities = cities
 		self.n_cars = n_cars
@@ -20,32 +171,77 @@ class VRP:
 		self.tabu_tenure = tabu_tenure
 		self.iterations = iterations
 		self.seed = seed
+		self.n_threads = n_threads
+		self.sample_size = sample_size
 
-		random.seed(self.seed)
-
-		# the first city with 0 demand is threated as a depo
-		self.depot = next(c for c in cities if c[1] == 0)
+		# single pass over the cities:
+		# the first city with 0 demand is threated as a depo,
 		# all other with positive demand is threated as a client
-		self.clients = [c for c in cities if c[1] > 0]
+		self.depot_idx = None
+		self.client_idxs = []
+		for k, c in enumerate(cities):
+			if c[1] > 0:
+				self.client_idxs.append(k)
+			elif c[1] == 0 and self.depot_idx is None:
+				self.depot_idx = k
+
+		if self.depot_idx is None:
+			raise ValueError('no city with 0 demand to use as depot')
+
+		# demands, loads and capacity are kept as integers
+		if any(c[1] != int(c[1]) for c in cities):
+			raise ValueError('city demands must be integers')
+		if capacity != int(capacity):
+			raise ValueError('capacity must be an integer')
+		self.capacity = int(capacity)
+
+		self.depot = cities[self.depot_idx]
+		self.clients = [cities[k] for k in self.client_idxs]
+		self.demands = np.fromiter((c[1] for c in cities), dtype=np.int32, count=len(cities))
+
+		# precomputed euclidean distance matrix
+		coords = np.array([(c[2], c[3]) for c in cities], dtype=np.float64)
+		self.D = np.ascontiguousarray(np.hypot(
+			coords[:, 0:1] - coords[:, 0],
+			coords[:, 1:2] - coords[:, 1]
+		))
+
+		# granular neighborhood: nearest cities of each city, itself excluded
+		k_max = len(cities) - 1
+		K = k_max if n_neighbors is None else min(n_neighbors, k_max)
+		# (the diagonal is masked, as cities may share coordinates)
+		D_off = self.D.copy()
+		np.fill_diagonal(D_off, np.inf)
+		self.knn = np.ascontiguousarray(np.argsort(D_off, axis=1)[:, :K], dtype=np.int32)
+
+		# route costs memoized by the tuple of visited city indices
+		self._route_cost_tuple = functools.lru_cache(maxsize=4096)(self._route_cost)
 
 	def distance(self, a, b):
 		"""
-		Distance between two cities (euclidean).
+		Distance between two cities given by index (euclidean).
 		"""
-		return math.hypot(a[2] - b[2], a[3] - b[3])
+		return self.D[a, b]
 
 	def route_cost(self, route):
 		"""
 		Calculate the total distance of a single vehicle route,
-		(start and end at depot).
+		(start and end at depot). A route is a sequence of city indices.
 		"""
-		cost = 0
-		prev = self.depot
-		for c in route:
-			cost += self.distance(prev, c)
-			prev = c
-		cost += self.distance(prev, self.depot)
-		return cost
+		return self._route_cost_tuple(tuple(int(k) for k in route))
+
+	def _route_cost(self, route):
+		"""
+		Uncached route_cost.
+		"""
+		D = self.D
+		cost = 0.0
+		prev = self.depot_idx
+		for k in route:
+			cost += D[prev, k]
+			prev = k
+		cost += D[prev, self.depot_idx]
+		return float(cost)
 
 	def total_cost(self, solution):
 		"""
@@ -57,79 +253,187 @@ class VRP:
 		"""
 		Calculate the total demand served by a single route.
 		"""
-		return sum(c[1] for c in route)
+		return int(self.demands[list(route)].sum())
 
-	def initial_solution(self):
+	def initial_solution(self, rng=None):
 		"""
 		Construct a simple initial solution.
-		"""
-		routes = [[] for _ in range(self.n_cars)]
-		loads = [0] * self.n_cars
 
-		for client in self.clients:
-			for i in range(self.n_cars):
-				if loads[i] + client[1] <= self.capacity:
-					routes[i].append(client)
-					loads[i] += client[1]
-					break
-
-		return routes
+		Returned as flat arrays: routes[i, :lens[i]] holds the city
+		indices visited by car i and loads[i] its total demand.
+		rng breaks ties between equal demands (default: seeded from seed).
+		"""
+		if rng is None:
+			rng = random.Random(self.seed)
+
+		routes = np.zeros((self.n_cars, max(len(self.client_idxs), 1)), dtype=np.int32)
+		lens = np.zeros(self.n_cars, dtype=np.int32)
+		loads = np.zeros(self.n_cars, dtype=np.int32)
+
+		# first-fit decreasing: largest demands are placed first,
+		# equal demands in a seed-dependent order
+		idx = np.array(self.client_idxs, dtype=np.int32)
+		rng.shuffle(idx)
+		idx = idx[np.argsort(-self.demands[idx], kind='stable')]
+
+		for k in idx:
+			fits = loads + self.demands[k] <= self.capacity
+			if not fits.any():
+				continue
+			i = np.argmax(fits)
+			routes[i, lens[i]] = k
+			lens[i] += 1
+			loads[i] += self.demands[k]
+
+		return routes, lens, loads
 
 	def tabu_search(self):
 		"""
 		Run the Tabu Search algorithm to minimize
 		the sum of distances traveled by all vehicles.
+
+		Returns (best, best_cost), best holding one list of
+		city indices (into cities) per car.
+		"""
+		if self.n_threads is None:
+			return self._tabu_search()
+
+		# numba's thread count is process-wide: restore it afterwards
+		n_threads = get_num_threads()
+		set_num_threads(self.n_threads)
+		try:
+			return self._tabu_search()
+		finally:
+			set_num_threads(n_threads)
+
+	def _tabu_search(self):
 		"""
-		current = self.initial_solution()
-		best = current
-		best_cost = self.total_cost(best)
+		Body of tabu_search, run with the thread count already set.
+		"""
+		# every run draws from its own generator, so a seed always
+		# reproduces the same search
+		rng = random.Random(self.seed)
+
+		routes, lens, loads = self.initial_solution(rng)
+		best_routes, best_lens = routes.copy(), lens.copy()
+
+		cost = best_cost = self.total_cost(
+			routes[r, :lens[r]] for r in range(self.n_cars)
+		)
+
+		# iteration until which moving client k into route j stays tabu
+		tabu_expiry = np.zeros((len(self.cities), self.n_cars), dtype=np.int32)
 
-		tabu = {}
+		# (client, route) pairs as flat ids into tabu_expiry's shape,
+		# for neighborhood sampling (the depot never moves)
+		move_ids = [
+			k * self.n_cars + j for k in self.client_idxs for j in range(self.n_cars)
+		]
+		sampling = self.sample_size is not None and self.sample_size < len(move_ids)
+		pairs = np.empty((self.sample_size if sampling else 0, 2), dtype=np.int32)
+
+		D, depot = self.D, self.depot_idx
 
 		for it in range(self.iterations):
-			neighbors = []
+			if sampling:
+				pairs[:, 0], pairs[:, 1] = np.divmod(
+					rng.sample(move_ids, self.sample_size), self.n_cars
+				)
+				i, a, j, b, delta = best_sampled_move(
+					D, self.knn, routes, lens, loads, self.demands, self.capacity,
+					tabu_expiry, it, pairs, depot
+				)
+			else:
+				i, a, j, b, delta = best_move(
+					D, self.knn, routes, lens, loads, self.demands, self.capacity,
+					tabu_expiry, it, self.n_cars, depot
+				)
 
-			for i in range(self.n_cars):
-				for j in range(self.n_cars):
-					if i == j:
-						continue
-					for c in current[i]:
-						if self.route_demand(current[j]) + c[1] <= self.capacity:
-							new = [r[:] for r in current]
-							new[i].remove(c)
-							new[j].append(c)
-							move = (c[0], i, j)
-							if move not in tabu:
-								neighbors.append((new, move))
-
-			if not neighbors:
+			if i < 0:
+				# an empty sample says nothing about the full neighborhood
+				if sampling:
+					continue
 				break
 
-			neighbors.sort(key=lambda x: self.total_cost(x[0]))
-			current, move = neighbors[0]
-			cost = self.total_cost(current)
+			# apply the selected move in place
+			k = routes[i, a]
+			routes[i, a:lens[i] - 1] = routes[i, a + 1:lens[i]]
+			lens[i] -= 1
+			routes[j, b + 1:lens[j] + 1] = routes[j, b:lens[j]]
+			routes[j, b] = k
+			lens[j] += 1
+			loads[i] -= self.demands[k]
+			loads[j] += self.demands[k]
 
-			tabu[move] = self.tabu_tenure
+			# the kernel's argmin already carries the cost change
+			cost += delta
 
-			for m in list(tabu):
-				tabu[m] -= 1
-				if tabu[m] <= 0:
-					del tabu[m]
+			tabu_expiry[k, j] = it + self.tabu_tenure
 
+			# the arrays are mutated in place, so only a new best is copied
 			if cost < best_cost:
-				best = current
+				best_routes[:], best_lens[:] = routes, lens
 				best_cost = cost
 
+		best = [
+			best_routes[r, :best_lens[r]].tolist() for r in range(self.n_cars)
+		]
 		return best, best_cost
 
 
-def visualize_solution(vrp, solution):
+def _run_tabu_search(job):
+	"""
+	Worker for multi_start_tabu_search: build a VRP and search it.
+	"""
+	cities, params = job
+	return VRP(cities, **params).tabu_search()
+
+
+def multi_start_tabu_search(cities, seeds, max_workers=None, **params):
+	"""
+	Run one independent tabu search per seed in separate processes
+	and return the best (solution, cost) among them.
+
+	params are passed to VRP; each worker scans single-threaded
+	unless n_threads is given.
+	"""
+	params.setdefault('n_threads', 1)
+	jobs = [(cities, dict(params, seed=seed)) for seed in seeds]
+
+	# spawn: forking a process that already runs numba threads is unsafe
+	ctx = multiprocessing.get_context('spawn')
+	with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as ex:
+		results = list(ex.map(_run_tabu_search, jobs))
+
+	return min(results, key=lambda r: r[1])
+
+
+def show_figure(fig, path):
+	"""
+	Show a figure, or save it to path when running headless (Agg).
+	"""
+	if matplotlib.get_backend().lower() == 'agg':
+		fig.savefig(path)
+	else:
+		plt.show()
+
+
+def visualize_solution(vrp, solution, ax=None):
 	"""
 	Create a simple path visualizations for all cars.
+	solution holds one list of city indices per car.
+
+	When ax is given it is cleared and redrawn, so one figure can be
+	reused across runs; otherwise a new figure is created and shown.
 	"""
 	depot = vrp.depot
 
-	plt.figure(figsize=(10, 8))
+	if ax is None:
+		_, ax = plt.subplots(figsize=(10, 8))
+		show = True
+	else:
+		ax.clear()
+		show = False
 
 	total_distance = 0
 	labeled = set()  # labeled cities
@@ -139,7 +443,7 @@ def visualize_solution(vrp, solution):
 			continue
 
 		# depot -> route -> depot
-		path = [depot] + route + [depot]
+		path = [depot] + [vrp.cities[k] for k in route] + [depot]
 
 		x = [c[3] for c in path]
 		y = [c[2] for c in path]
@@ -147,15 +451,15 @@ def visualize_solution(vrp, solution):
 		route_distance = vrp.route_cost(route)
 		total_distance += route_distance
 
-		plt.plot(
+		ax.plot(
 			x, y, marker='o',
 			label=f'Car {i+1} (dist={route_distance:.2f})'
 		)
 
 		# cities label
-		for c in route:
+		for c in path[1:-1]:
 			if c[0] not in labeled:
-				plt.text(
+				ax.text(
 					c[3], c[2], c[0],
 					fontsize=8,
 					ha='left',
@@ -163,8 +467,8 @@ def visualize_solution(vrp, solution):
 				)
 				labeled.add(c[0])
 
-	plt.scatter(depot[3], depot[2], s=180, marker='*', color='black')
-	plt.text(
+	ax.scatter(depot[3], depot[2], s=180, marker='*', color='black')
+	ax.text(
 		depot[3], depot[2], depot[0],
 		fontsize=10,
 		fontweight='bold',
@@ -172,16 +476,20 @@ def visualize_solution(vrp, solution):
 		va='bottom'
 	)
 
-	plt.title(
+	ax.set_title(
 		f'VRP Solution – Total distance = {total_distance:.2f} '
 		f'(~{total_distance * 111:.1f} km)'
 	)
-	plt.xlabel('Longitude (X)')
-	plt.ylabel('Latitude (Y)')
-	plt.legend()
-	plt.grid(True)
-	plt.tight_layout()
-	plt.show()
+	ax.set_xlabel('Longitude (X)')
+	ax.set_ylabel('Latitude (Y)')
+	ax.legend()
+	ax.grid(True)
+	ax.figure.tight_layout()
+
+	if show:
+		show_figure(ax.figure, 'vrp_solution.png')
+
+	return ax
 
 cities = [
 	#(city_name, demand, Y, X)
@@ -218,39 +526,52 @@ cities = [
 	("Zamosc", 300, 50.7174, 23.2523)
 ]
 
-vrp = VRP(cities, n_cars=5, capacity=1000, tabu_tenure=10, iterations=100, seed=123)
+if __name__ == '__main__':
+	vrp = VRP(cities, n_cars=5, capacity=1000, tabu_tenure=10, iterations=100, seed=123)
 
-sol, cost = vrp.tabu_search()
-print("Best total cost:", cost)
+	sol, cost = vrp.tabu_search()
+	print("Best total cost:", cost)
 
-visualize_solution(vrp, sol)
+	sol, cost = multi_start_tabu_search(
+		cities, seeds=range(123, 131),
+		n_cars=5, capacity=1000, tabu_tenure=10, iterations=100
+	)
+	print("Best multi-start total cost:", cost)
 
-"""
-results = {}
+	visualize_solution(vrp, sol)
 
-for n in range(1, 11):
-	vrp = VRP(
-		cities,
-		n_cars=n,
-		capacity=1000,
-		tabu_tenure=10,
-		iterations=100,
-		seed=123
-	)
-	_, cost = vrp.tabu_search()
-	results[n] = cost
-	print(f"Best total cost for {n} car: {cost:.2f}")
-
-# arrays for visualitzation
-cars = list(results.keys())
-costs = list(results.values())
-
-plt.figure(figsize=(8, 5))
-plt.plot(cars, costs, marker='o')
-plt.xlabel("Number of Cars")
-plt.ylabel("Total Distance [degrees]")
-plt.title("Total Distance vs Number of Cars")
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-"""
\ No newline at end of file
+	"""
+	results = {}
+
+	# one figure reused for every run
+	fig, ax = plt.subplots(figsize=(10, 8))
+
+	for n in range(1, 11):
+		vrp = VRP(
+			cities,
+			n_cars=n,
+			capacity=1000,
+			tabu_tenure=10,
+			iterations=100,
+			seed=123
+		)
+		sol, cost = vrp.tabu_search()
+		results[n] = cost
+		print(f"Best total cost for {n} car: {cost:.2f}")
+
+		visualize_solution(vrp, sol, ax)
+		fig.savefig(f'vrp_{n}_cars.png')
+
+	# arrays for visualitzation
+	cars = list(results.keys())
+	costs = list(results.values())
+
+	ax.clear()
+	ax.plot(cars, costs, marker='o')
+	ax.set_xlabel("Number of Cars")
+	ax.set_ylabel("Total Distance [degrees]")
+	ax.set_title("Total Distance vs Number of Cars")
+	ax.grid(True)
+	fig.tight_layout()
+	show_figure(fig, 'vrp_cars.png')
+	"""
\ No newline at end of file